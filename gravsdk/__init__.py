@@ -1,11 +1,29 @@
 import sys
 from typing import *
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import json
+import os
+import time
 from urllib.parse import urlparse
 
 from gravsdk import gravcrud
 
+_MISSING = object()
+
+# These keep the leading `/rest` the client paths have always carried. The
+# CRUD layer prepends `{host}/rest/` as well, so they are requested as
+# `{host}/rest//rest/...`; that is existing wire behaviour and is left as is
+_CLIENT_LISTING_PATH = '/rest/OE_CLIEN'
+_CLIENT_PATH = '/rest/client/'
+
+@functools.lru_cache(maxsize=64)
+def _csv(items: Tuple[str,...]) -> str:
+	# Callers tend to pass the same field lists over and over
+	return ','.join(items)
+
 class GravError(Exception):
 	"""
 	# Exception Class: `GravError`
@@ -58,7 +76,15 @@ class GravGeneralError(Exception):
 
 class sdkv1:
 
-	def __init__(self, hoststring: str, ssl_verify_enable: bool = True):
+	__slots__ = ( 'hostparts', 'ssl_verify_enable', 'protocol', 'CRUD', 'session_cache_path', 'session_check_ttl', '_session_check_cache' )
+
+	# CRUD transport for each supported url scheme
+	_CRUD_FACTORY: Dict[str,Any] = {
+		'https': gravcrud.HTTPCRUD,
+		#'wss': gravcrud.WSCRUD,
+	}
+
+	def __init__(self, hoststring: str, ssl_verify_enable: bool = True, cache_ttl: float = 30.0, session_cache_path: Optional[str] = None, session_check_ttl: float = 2.0):
 		try:
 			self.hostparts = urlparse(
 				hoststring
@@ -69,58 +95,139 @@ class sdkv1:
 			)
 		self.ssl_verify_enable = ssl_verify_enable
 		self.protocol = self.hostparts.scheme
-		#TODO FIXME: make this cleaner with enum
-		if self.protocol == 'https':
-			self.CRUD = gravcrud.HTTPCRUD(
-				self.hostparts.geturl(),
-				self.ssl_verify_enable,
-			)
-		#elif self.protocol == 'wss':
-		#	self.CRUD = gravcrud.WSCRUD(
-		#		self.hostparts.geturl(),
-		#		self.ssl_verify_enable
-		#	)
-		else:
+		factory = self._CRUD_FACTORY.get(self.protocol)
+		if factory is None:
 			raise GravError(
 				'invalid protocol specified, must be `https` or `wss`'
 			)
+		self.CRUD = factory(
+			self.hostparts.geturl(),
+			self.ssl_verify_enable,
+			cache_ttl = cache_ttl,
+		)
+		self.session_cache_path = session_cache_path
+		self._load_session_cache()
+		self.session_check_ttl = session_check_ttl
+		self._session_check_cache: Optional[Tuple[float,bool,Dict[str,str]]] = None
+
+	def _load_session_cache(self) -> None:
+		if not self.session_cache_path:
+			return
+		try:
+			with open(self.session_cache_path) as f:
+				cookies = json.load(f)
+		except (OSError, ValueError):
+			# No usable saved session, the next login will present credentials
+			return
+		self.CRUD.set_cookies(cookies)
+
+	def _save_session_cache(self) -> None:
+		if not self.session_cache_path:
+			return
+		# The cookies are as good as a password: keep the file private to this
+		# user and replace it atomically so a reader never sees a partial file
+		tmppath = f'{self.session_cache_path}.{os.getpid()}.tmp'
+		try:
+			fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+			with os.fdopen(fd, 'w') as f:
+				json.dump(self.CRUD.get_cookies(), f)
+			os.replace(tmppath, self.session_cache_path)
+		except OSError:
+			# The login itself succeeded, a broken session cache only means the
+			# next SDK instance will present credentials again
+			try:
+				os.remove(tmppath)
+			except OSError:
+				pass
+
+	def _forget_session_cache(self) -> None:
+		if not self.session_cache_path:
+			return
+		try:
+			os.remove(self.session_cache_path)
+		except OSError:
+			# Already gone or not removable; the server side session is over
+			# either way, so this must not fail the logout
+			pass
+
+	def close(self) -> None:
+		self.CRUD.close()
+
+	def clear_cache(self) -> None:
+		self.CRUD.cache.clear()
+		self._session_check_cache = None
+
+	def __enter__(self) -> 'sdkv1':
+		return self
+
+	def __exit__(self, *exc_info: Any) -> None:
+		self.close()
 
 	def _login_sanity_check(self, result: bool, responsedata: Dict[str, str]) -> bool:
 		if not result:
 			raise GravAuthError(
 				'Invalid API data received'
 			)
-		try:
-			success = responsedata[
-				'success'
-			]
-		except KeyError:
+		success = responsedata.get('success', _MISSING)
+		if success is _MISSING:
 			raise GravAuthError(
 				'api response missing `success` key'
 			)
-		if not success and 'error' in responsedata:
+		if success:
+			return True
+		error = responsedata.get('error', _MISSING)
+		if error is not _MISSING:
 			# API authentication call was not successful
 			raise GravAuthError(
-				responsedata['error']
+				error
 			)
-		if not success:
-			return False
-		return True
+		return False
 	
 	def login_session_check(self) -> Tuple[bool,Dict[str,str]]:
+		cached = self._session_check_cached()
+		if cached is not None:
+			return cached
+		# The session check keeps its own short-lived memo instead of the
+		# read cache, see `session_check_ttl`
 		result, responsedata = self.CRUD.read(
 			'login',
-			{}
+			{},
+			cache = False,
 		)
+		return self._login_session_check_response(result, responsedata)
+
+	def _session_check_cached(self) -> Optional[Tuple[bool,Dict[str,str]]]:
+		if self._session_check_cache is None:
+			return None
+		timestamp, status, userdata = self._session_check_cache
+		if time.monotonic() - timestamp >= self.session_check_ttl:
+			return None
+		# User rows are flat, a shallow copy keeps callers from changing the memo
+		return status, dict(userdata)
+
+	def _remember_session_check(self, status: bool, userdata: Dict[str,str]) -> Tuple[bool,Dict[str,str]]:
+		self._session_check_cache = ( time.monotonic(), status, dict(userdata) )
+		return status, userdata
+
+	def _login_session_check_response(self, result: bool, responsedata: Dict[str, Any]) -> Tuple[bool,Dict[str,str]]:
 		if not self._login_sanity_check(result, responsedata):
-			return False, {}
+			return self._remember_session_check(False, {})
 		if len(responsedata['rows']) == 0:
-			return False, {}
+			return self._remember_session_check(False, {})
 		else:
-			return True, responsedata['rows'][0]
+			return self._remember_session_check(True, responsedata['rows'][0])
 		
 	
 	def login(self, username: str, password: str) -> bool:
+		if self.CRUD.get_cookies():
+			# We may still have a live session, which is much cheaper to check
+			# than a full login
+			try:
+				status, userdata = self.login_session_check()
+			except (GravAuthError, gravcrud.GravJSONValueError):
+				status, userdata = False, {}
+			if self._login_session_reusable(username, status, userdata):
+				return True
 		payload = {
 			'USER' : username,
 			'PASSWORD' : password
@@ -129,6 +236,19 @@ class sdkv1:
 			'login',
 			payload
 		)
+		return self._login_response(result, responsedata)
+
+	def _login_session_reusable(self, username: str, status: bool, userdata: Dict[str, Any]) -> bool:
+		# Password problems fall through to a full login so it can report them
+		return (
+			status
+			and userdata.get('USER') == username
+			and not userdata.get('FORCE_PWD_CHANGE')
+			and not userdata.get('expired_pwd')
+		)
+
+	def _login_response(self, result: bool, responsedata: Dict[str, Any]) -> bool:
+		self._session_check_cache = None
 		if not self._login_sanity_check(result, responsedata):
 			return False
 		if 'rows' not in responsedata:
@@ -152,6 +272,8 @@ class sdkv1:
 				f'Password has expired. Please log in with a browser to https://{self.hostparts.netloc} to change your password'
 			)
 		#TODO FIXME: deal with other scenarios
+		self._save_session_cache()
+		self._remember_session_check(True, rows)
 		return True
 
 	def logout(self) -> bool:
@@ -159,45 +281,243 @@ class sdkv1:
 			'login',
 			{}
 		)
+		return self._logout_response(result, responsedata)
+
+	def _logout_response(self, result: bool, responsedata: Dict[str, Any]) -> bool:
+		self._session_check_cache = None
 		if not self._login_sanity_check(result, responsedata):
 			return False
+		self._forget_session_cache()
 		return True
 	
 	def client ( self, client_id: int = 0 ): #TODO FIXME: Need return type
 		return sdkv1client ( self, client_id )
 
+	def clients_batch(self, client_ids: Sequence[int], limit: int = 9999) -> Dict[int,Dict[str,Any]]:
+		"""
+		Look up several clients at once. The requests are issued concurrently
+		over the pooled session, so the wall time is roughly one round trip
+		rather than one per client. Results are keyed by client id; no
+		ordering is guaranteed.
+		"""
+		results: Dict[int,Dict[str,Any]] = {}
+		if not client_ids:
+			return results
+		with ThreadPoolExecutor(max_workers = min(16, len(client_ids))) as ex:
+			futures = {
+				ex.submit(self.client(client_id).listing, limit): client_id
+				for client_id in client_ids
+			}
+			for fut in as_completed(futures):
+				results[futures[fut]] = fut.result()[1]
+		return self._clients_batch_response(client_ids, results)
+
+	def _clients_batch_response(self, client_ids: Sequence[int], results: Dict[int,Dict[str,Any]]) -> Dict[int,Dict[str,Any]]:
+		missing = []
+		for client_id in client_ids:
+			# API failures such as an expired session are not "not found"
+			if not self._login_sanity_check(True, results[client_id]):
+				raise GravAuthError(
+					f'client {client_id} lookup was not successful'
+				)
+			if not results[client_id].get('rows'):
+				missing.append(client_id)
+		if missing:
+			raise GravGeneralError(
+				f'clients not found: {missing}'
+			)
+		return {
+			client_id: results[client_id]['rows'][0]
+			for client_id in client_ids
+		}
+
+
+class sdkv1_async(sdkv1):
+	"""
+	# Gravitas Python SDK v1 (asyncio)
+
+	Same interface as `sdkv1`, but every API call is a coroutine backed by a
+	pooled `httpx.AsyncClient`, so independent calls can run concurrently:
+
+	    async with sdkv1_async('https://10.10.10.10:4443') as sdk:
+	        await sdk.login('restuser', 'gravitas1234567890')
+	        results = await asyncio.gather(*(
+	            sdk.client(client_id).listing() for client_id in client_ids
+	        ))
+	"""
+	__slots__ = ()
+
+	_CRUD_FACTORY: Dict[str,Any] = {
+		'https': gravcrud.AsyncHTTPCRUD,
+	}
+
+	async def close(self) -> None: # type: ignore[override]
+		await self.CRUD.close()
+
+	def __enter__(self) -> 'sdkv1_async':
+		raise TypeError(
+			'sdkv1_async must be used with `async with`'
+		)
+
+	def __exit__(self, *exc_info: Any) -> None:
+		raise TypeError(
+			'sdkv1_async must be used with `async with`'
+		)
+
+	async def __aenter__(self) -> 'sdkv1_async':
+		return self
+
+	async def __aexit__(self, *exc_info: Any) -> None:
+		await self.close()
+
+	async def login_session_check(self) -> Tuple[bool,Dict[str,str]]: # type: ignore[override]
+		cached = self._session_check_cached()
+		if cached is not None:
+			return cached
+		result, responsedata = await self.CRUD.read(
+			'login',
+			{},
+			cache = False,
+		)
+		return self._login_session_check_response(result, responsedata)
+
+	async def login(self, username: str, password: str) -> bool: # type: ignore[override]
+		if self.CRUD.get_cookies():
+			try:
+				status, userdata = await self.login_session_check()
+			except (GravAuthError, gravcrud.GravJSONValueError):
+				status, userdata = False, {}
+			if self._login_session_reusable(username, status, userdata):
+				return True
+		payload = {
+			'USER' : username,
+			'PASSWORD' : password
+		}
+		result, responsedata = await self.CRUD.create(
+			'login',
+			payload
+		)
+		return self._login_response(result, responsedata)
+
+	async def logout(self) -> bool: # type: ignore[override]
+		result, responsedata = await self.CRUD.delete(
+			'login',
+			{}
+		)
+		return self._logout_response(result, responsedata)
+
+	async def clients_batch(self, client_ids: Sequence[int], limit: int = 9999) -> Dict[int,Dict[str,Any]]: # type: ignore[override]
+		responses = await asyncio.gather(*(
+			self.client(client_id).listing(limit) for client_id in client_ids
+		))
+		results = {
+			client_id: responsedata
+			for client_id, (result, responsedata) in zip(client_ids, responses)
+		}
+		return self._clients_batch_response(client_ids, results)
+
 
 class sdkv1client:
+	__slots__ = ( 'sdk', 'client_id', 'path' )
+
 	def __init__ ( self, sdk: sdkv1, client_id: int ) -> None:
 		self.sdk = sdk
 		self.client_id = client_id
+		self.path = f'{_CLIENT_PATH}{client_id}/'
 	
 	def listing(self, limit: int = 9999) -> Tuple[bool,Dict[str,str]]:
-		uri = '/rest/OE_CLIEN'
-		params = {
-			'limit' : limit
-		}
 		if self.client_id != 0:
-			params['filter'] = f'CLIENT_ID={self.client_id}'
+			params = {
+				'limit' : limit,
+				'filter' : f'CLIENT_ID={self.client_id}',
+			}
 		else:
 			# To limit spamming the API for large amounts of data
-			params['fields'] = 'CLIENT_ID,NAME'
-		return self.sdk.CRUD.read ( uri, params )
+			params = {
+				'limit' : limit,
+				'fields' : 'CLIENT_ID,NAME',
+			}
+		return self.sdk.CRUD.read ( _CLIENT_LISTING_PATH, params )
+
+	def listing_iter(self, fields: Optional[Sequence[str]] = None, limit: int = 0) -> Iterator[Dict[str,Any]]:
+		"""
+		Stream client rows as they arrive instead of loading the whole response,
+		for listings too large to hold in memory. `limit` is always sent; the
+		API returns every row for `limit = 0`.
+		Requires `ijson` and the synchronous `sdkv1`.
+
+		The `success` key may follow the rows, so it cannot be checked up front.
+		It is checked once the body has been read: an unsuccessful or malformed
+		response raises `GravAuthError` after the last row has been yielded.
+		"""
+		if not hasattr ( self.sdk.CRUD, 'read_stream' ):
+			raise GravGeneralError(
+				'listing_iter is only available on the synchronous sdkv1'
+			)
+		import ijson # pip install ijson
+		params: Dict[str,Any] = {
+			# Sent even when 0 so the server's default page size never applies
+			'limit' : limit,
+		}
+		if fields:
+			params['fields'] = _csv ( tuple ( fields ) )
+		if self.client_id != 0:
+			params['filter'] = f'CLIENT_ID={self.client_id}'
+		return self._listing_iter ( ijson, params )
+
+	def _listing_iter(self, ijson: Any, params: Dict[str,Any]) -> Iterator[Dict[str,Any]]:
+		with self.sdk.CRUD.read_stream ( _CLIENT_LISTING_PATH, params ) as req:
+			if not req.ok:
+				# Error bodies are small, check them like any other response
+				responsedata = gravcrud._decode ( req )
+				self.sdk._login_sanity_check ( True, responsedata )
+				raise GravAuthError(
+					f'HTTP {req.status_code} {req.reason}'
+				)
+			# Undo any gzip/deflate transfer encoding before parsing
+			req.raw.decode_content = True
+			status: Dict[str,Any] = {}
+			builder = None
+			try:
+				for prefix, event, value in ijson.parse ( req.raw, use_float = True ):
+					if builder is not None:
+						builder.event ( event, value )
+						if prefix == 'rows.item' and event in ( 'end_map', 'end_array' ):
+							yield builder.value
+							builder = None
+					elif prefix == 'rows.item':
+						if event in ( 'start_map', 'start_array' ):
+							builder = ijson.ObjectBuilder()
+							builder.event ( event, value )
+						else:
+							yield value
+					elif prefix in ( 'success', 'error' ):
+						status[prefix] = value
+			except ijson.JSONError as e:
+				raise GravAuthError(
+					f'Invalid API data received: {e}'
+				)
+			if not self.sdk._login_sanity_check ( True, status ):
+				raise GravAuthError(
+					'api response was not successful'
+				)
 
 	def orders(self): 
 		return sdkv1endpoint(
 			self.sdk,
-			f'/rest/client/{self.client_id}/ORDERS'
+			self.path + 'ORDERS'
 		)
 
 	def contacts(self): #TODO FIXME: Need return type
 		return sdkv1endpoint(
 			self.sdk,
-			f'/rest/client/{self.client_id}/PT_CONTC'
+			self.path + 'PT_CONTC'
 		)
 
 
 class sdkv1endpoint:
+	__slots__ = ( 'sdk', 'endpoint' )
+
 	def __init__(self, sdk: sdkv1, endpoint: str) -> None:
 		self.sdk = sdk
 		self.endpoint = endpoint
@@ -212,7 +532,7 @@ class sdkv1endpoint:
 		if offset:
 			params['offset'] = offset
 		if fields:
-			params['fields'] = ','.join ( fields )
+			params['fields'] = _csv ( tuple ( fields ) )
 		if filter:
 			params['filter'] = ','.join ( f'{k}={v!r}' for k, v in filter.items() )
 		opresult = self.sdk.CRUD.read(
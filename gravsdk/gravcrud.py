@@ -4,6 +4,13 @@ Gavitas CRUD library
 import sys
 from typing import *
 import json
+import threading
+import time
+from collections import OrderedDict
+try:
+	import orjson # pip install orjson
+except ImportError:
+	orjson = None
 
 class GravJSONValueError(Exception):
 	"""# Exception Class: GravJSONValueError
@@ -21,16 +28,132 @@ class GravJSONValueError(Exception):
 		self.message = f"Response is not valid JSON: `{responsetext}`"
 		super().__init__(self.message)
 
+class ResponseCache(object):
+	"""
+	LRU cache of GET response bodies, keyed on endpoint and params
+
+	Entries younger than `ttl` seconds are returned without touching the
+	network. Older entries are kept so their ETag can be sent back as
+	`If-None-Match`; a 304 reply then refreshes the entry and the stored
+	body is reused. A `ttl` of 0 disables the cache.
+
+	The raw body bytes are stored rather than the parsed dictionary, so
+	every hit decodes a private copy for its caller (cheap with `orjson`)
+	and nobody can modify what another caller sees.
+	"""
+	def __init__(self, ttl: float = 30.0, maxsize: int = 256) -> None:
+		self.ttl = ttl
+		self.maxsize = maxsize
+		self._entries: 'OrderedDict[Tuple[Any,...],Tuple[float,Optional[str],bytes]]' = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(endpoint: str, params: Optional[Dict[str,Any]]) -> Tuple[Any,...]:
+		return endpoint, frozenset((params or {}).items())
+
+	def lookup(self, key: Tuple[Any,...]) -> Tuple[bool,Optional[str],Optional[bytes]]:
+		"""
+		Returns `(fresh, etag, content)` for `key`, or `(False, None, None)` on a miss
+		"""
+		if self.ttl <= 0:
+			return False, None, None
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return False, None, None
+			self._entries.move_to_end(key)
+		timestamp, etag, content = entry
+		return time.monotonic() - timestamp < self.ttl, etag, content
+
+	def store(self, key: Tuple[Any,...], etag: Optional[str], content: bytes) -> None:
+		if self.ttl <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (time.monotonic(), etag, content)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last = False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+_JSON_HEADERS = { 'Content-Type': 'application/json' }
+
+_DEFAULT_HEADERS = {
+	'Accept': 'application/json',
+	'User-Agent': 'gravsdk/1',
+}
+
+def _json_loads(content: bytes) -> Any:
+	if orjson is not None:
+		return orjson.loads(content)
+	return json.loads(content)
+
+def _json_dumps(body: Any) -> bytes:
+	if orjson is not None:
+		return orjson.dumps(body)
+	return json.dumps(body).encode()
+
+def _decode(req: Any) -> Dict[str,Any]:
+	try:
+		return _json_loads(req.content)
+	except (ValueError):
+		raise GravJSONValueError (
+			req.text
+		)
+
+def _cache_response(cache: ResponseCache, key: Tuple[Any,...], req: Any, etag: Optional[str], cached: Optional[bytes]) -> Dict[str,Any]:
+	if req.status_code == 304 and cached is not None:
+		# Not modified: keep the body we already have
+		cache.store ( key, req.headers.get ( 'ETag' ) or etag, cached )
+		return _json_loads ( cached )
+	responsedata = _decode ( req )
+	if 200 <= req.status_code < 300:
+		cache.store ( key, req.headers.get ( 'ETag' ), req.content )
+	return responsedata
+
 class HTTPCRUD(object):
 	"""
 	HTTP API CRUD interface
 	"""
-	def __init__(self, host: str, ssl_verify_enable: bool, testmode: bool = False) -> None:
+	def __init__(self, host: str, ssl_verify_enable: bool, testmode: bool = False, session: Optional[Any] = None, cache_ttl: float = 30.0) -> None:
 		import requests
+		from requests.adapters import HTTPAdapter
+		from urllib3.util import Retry
 		self.host = host
+		# Joined once here so building a request URI is a single concatenation
+		self.baseuri = f'{host}/rest/'
 		self.ssl_verify_enable = ssl_verify_enable
-		self.session = requests.Session()
-	
+		if session is None:
+			# One pooled, keep-alive session for every call so only the first
+			# request pays the TCP+TLS handshake
+			session = requests.Session()
+			adapter = HTTPAdapter(
+				pool_connections = 10,
+				pool_maxsize = 20,
+				max_retries = Retry(
+					total = 3,
+					backoff_factor = 0.2,
+					status_forcelist = [502, 503, 504],
+					raise_on_status = False,
+				),
+			)
+			session.mount('https://', adapter)
+			session.headers.update(_DEFAULT_HEADERS)
+		session.verify = self.ssl_verify_enable
+		self.session = session
+		self.cache = ResponseCache(cache_ttl)
+
+	def close(self) -> None:
+		self.session.close()
+
+	def get_cookies(self) -> Dict[str,str]:
+		return self.session.cookies.get_dict()
+
+	def set_cookies(self, cookies: Dict[str,str]) -> None:
+		self.session.cookies.update(cookies)
+
 	def _request ( self,
 		method: Callable[...,Any],
 		endpoint: str,
@@ -38,21 +161,37 @@ class HTTPCRUD(object):
 		params: Optional[Dict[str,str]] = None,
 		json_body: Optional[Dict[str,str]] = None,
 	) -> Tuple[bool,Dict[str,str]]:
-		uri = f'{self.host}/rest/{endpoint}'
-		req = method ( uri, params = params, json = json_body, verify = self.ssl_verify_enable )
-		try:
-			responsedata = req.json()
-		except (ValueError):
-			raise GravJSONValueError (
-				req.text
-			)
-		return True, responsedata
+		uri = self.baseuri + endpoint
+		if json_body is None:
+			req = method ( uri, params = params, verify = self.ssl_verify_enable )
+		else:
+			req = method ( uri, params = params, data = _json_dumps ( json_body ), headers = _JSON_HEADERS, verify = self.ssl_verify_enable )
+		# Anything that modifies data may change what a cached read would return
+		self.cache.clear()
+		return True, _decode ( req )
 	
 	def create(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
 		return self._request ( self.session.post, endpoint, json_body = params )
 	
-	def read(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
-		return self._request ( self.session.get, endpoint, params = params )
+	def read(self, endpoint: str, params: dict, cache: bool = True) -> Tuple[bool,Dict[str,str]]:
+		uri = self.baseuri + endpoint
+		if not cache:
+			return True, _decode ( self.session.get ( uri, params = params, verify = self.ssl_verify_enable ) )
+		key = self.cache.key ( endpoint, params )
+		fresh, etag, cached = self.cache.lookup ( key )
+		if fresh:
+			return True, _json_loads ( cached )
+		headers = { 'If-None-Match': etag } if etag else None
+		req = self.session.get ( uri, params = params, headers = headers, verify = self.ssl_verify_enable )
+		return True, _cache_response ( self.cache, key, req, etag, cached )
+
+	def read_stream(self, endpoint: str, params: dict) -> Any:
+		"""
+		Issue an uncached GET and return the `requests.Response` without reading
+		its body, so the caller can parse it incrementally from `response.raw`
+		"""
+		uri = self.baseuri + endpoint
+		return self.session.get ( uri, params = params, stream = True, verify = self.ssl_verify_enable )
 	
 	def update(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
 		return self._request ( self.session.patch, endpoint, json_body = params )
@@ -60,6 +199,79 @@ class HTTPCRUD(object):
 	def delete(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
 		return self._request ( self.session.delete, endpoint, params = params )
 
+class AsyncHTTPCRUD(object):
+	"""
+	Asynchronous HTTP API CRUD interface
+
+	Every CRUD method is a coroutine. Calls share one pooled `httpx.AsyncClient`
+	(HTTP/2 when the `h2` package is installed) so concurrent calls made with
+	`asyncio.gather` are multiplexed over the same connection.
+	"""
+	def __init__(self, host: str, ssl_verify_enable: bool, testmode: bool = False, client: Optional[Any] = None, cache_ttl: float = 30.0) -> None:
+		import httpx # pip install httpx
+		from importlib.util import find_spec
+		self.host = host
+		self.baseuri = f'{host}/rest/'
+		self.ssl_verify_enable = ssl_verify_enable
+		if client is None:
+			client = httpx.AsyncClient(
+				limits = httpx.Limits(
+					max_connections = 100,
+					max_keepalive_connections = 20,
+				),
+				http2 = find_spec('h2') is not None,
+				headers = _DEFAULT_HEADERS,
+				verify = self.ssl_verify_enable,
+				timeout = 30.0,
+			)
+		self.client = client
+		self.cache = ResponseCache(cache_ttl)
+
+	async def close(self) -> None:
+		await self.client.aclose()
+
+	def get_cookies(self) -> Dict[str,str]:
+		return dict(self.client.cookies)
+
+	def set_cookies(self, cookies: Dict[str,str]) -> None:
+		self.client.cookies.update(cookies)
+
+	async def _request ( self,
+		method: str,
+		endpoint: str,
+		*,
+		params: Optional[Dict[str,str]] = None,
+		json_body: Optional[Dict[str,str]] = None,
+	) -> Tuple[bool,Dict[str,str]]:
+		uri = self.baseuri + endpoint
+		if json_body is None:
+			req = await self.client.request ( method, uri, params = params )
+		else:
+			req = await self.client.request ( method, uri, params = params, content = _json_dumps ( json_body ), headers = _JSON_HEADERS )
+		self.cache.clear()
+		return True, _decode ( req )
+
+	async def create(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
+		return await self._request ( 'POST', endpoint, json_body = params )
+
+	async def read(self, endpoint: str, params: dict, cache: bool = True) -> Tuple[bool,Dict[str,str]]:
+		uri = self.baseuri + endpoint
+		if not cache:
+			return True, _decode ( await self.client.get ( uri, params = params ) )
+		key = self.cache.key ( endpoint, params )
+		fresh, etag, cached = self.cache.lookup ( key )
+		if fresh:
+			return True, _json_loads ( cached )
+		headers = { 'If-None-Match': etag } if etag else None
+		req = await self.client.get ( uri, params = params, headers = headers )
+		return True, _cache_response ( self.cache, key, req, etag, cached )
+
+	async def update(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
+		return await self._request ( 'PATCH', endpoint, json_body = params )
+
+	async def delete(self, endpoint: str, params: dict) -> Tuple[bool,Dict[str,str]]:
+		return await self._request ( 'DELETE', endpoint, params = params )
+
 """
 class WSCRUD(object):
 	# TODO FIXME: write this whole class
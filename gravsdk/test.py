@@ -10,6 +10,9 @@ This is version 1 of the gravitas SDK. This includes the legacy/compatibility im
 |`protocol`|Optional|string|Protocol used for communication with the Gravitas API server. Options are `https` and `wss` (defaults to `https`).
 |`port`|Optional|integer|Port number of the Gravitas API server (defaults to `443`)|
 |`ssl_verify_enable`|Optional|boolean|Enables/disables SSL certificate verification (defaults to `True`). **NOTE: in production this must remain as `True`**
+|`cache_ttl`|Optional|float|Seconds that read responses are cached for (defaults to `30`, `0` disables caching). Any create, update, or delete clears the cache, as does `sdk.clear_cache()`|
+|`session_cache_path`|Optional|string|File the session cookies are saved to after a successful login and loaded from on startup, so a live session is reused instead of logging in again (defaults to `None`, no file)|
+|`session_check_ttl`|Optional|float|Seconds that the result of `login_session_check` is remembered for (defaults to `2`, `0` always checks with the API)|
 
 ## Usage
 
@@ -20,9 +23,11 @@ This is version 1 of the gravitas SDK. This includes the legacy/compatibility im
 	)
 """
 
+import asyncio
 import configparser
+import json
 import pytest
-from gravsdk import sdkv1, GravAuthError
+from gravsdk import sdkv1, sdkv1_async, GravAuthError, GravGeneralError
 import requests_mock
 import urllib
 host = 'https://127.0.0.1:443'
@@ -55,7 +60,7 @@ class Test_authentication():
 		[<< Authentication](authentication/README.md)
 		# `login` SDK method
 		
-		The `login` SDK method is used to log in and establish a session with the Gravitas API server
+		The `login` SDK method is used to log in and establish a session with the Gravitas API server. If the SDK already holds a live session for the same user, the credentials are not sent again.
 		
 		|Attribute|Required|Type|Description|
 		|-|-|-|-|
@@ -106,6 +111,8 @@ class Test_authentication():
 				text = testdata['responsetext']
 			)
 			assert sdk.login(testdata['login'], testdata['password']) == True
+			assert m.last_request.headers['Content-Type'] == 'application/json'
+			assert m.last_request.json() == { 'USER': testdata['login'], 'PASSWORD': testdata['password'] }
 		print('Passed!!!')
 		testdata = [
 			{
@@ -213,6 +220,8 @@ class Test_authentication():
 		|`USER_ID`|integer|The user ID number of the user|`2`|
 		|`expired_pwd`|boolean|Whether or not the user's password is expired|`False`|
 
+		The result is remembered for `session_check_ttl` seconds (see [SDK Version 1](README.md)) and is reset by `login` and `logout`.
+
 		## Usage
 
 		    status, userdata = sdk.login_session_check()
@@ -254,6 +263,7 @@ class Test_authentication():
 			assert session_check[1]['expired_pwd'] == False
 			print("Passed!!!")
 			print("Test: `login_session_check: not logged in`")
+			sdk.clear_cache() # the logged in response above is still cached
 			m.get(
 				f'{host}/{basepath}/{path}',
 				status_code = 200,
@@ -268,6 +278,120 @@ class Test_authentication():
 			assert not session_check[1] # dictionary should be empty
 		print("Passed!!!")
 
+	def test_login_session_check_memo(self):
+		"""
+		# Session check memoisation
+
+		The result of `login_session_check` is remembered for `session_check_ttl` seconds (default `2`), so bursts of checks only reach the API once. `login`, `logout` and `sdk.clear_cache()` reset it. Pass `session_check_ttl = 0` to always ask the API.
+		"""
+		print("")
+		print("session check memo tests")
+		print("------------------------")
+		path = 'login'
+		with requests_mock.mock() as m:
+			m.get(
+				f'{host}/{basepath}/{path}',
+				status_code = 200,
+				text = """{
+					"rows": [{"USER":"restuser","USER_ID":2}],
+					"success":true
+				}"""
+			)
+			print("Test: `repeated checks within the ttl`")
+			sdk.clear_cache()
+			status, userdata = sdk.login_session_check()
+			assert status == True
+			userdata['USER'] = 'mutated'
+			assert sdk.login_session_check()[1]['USER'] == 'restuser'
+			assert m.call_count == 1
+			print("Passed!!!")
+			print("Test: `session_check_ttl = 0`")
+			with sdkv1(host, False, session_check_ttl = 0) as uncached:
+				assert uncached.login_session_check()[0] == True
+				assert uncached.login_session_check()[0] == True
+			assert m.call_count == 3
+			print("Passed!!!")
+			print("Test: `logout resets the memo`")
+			m.delete(
+				f'{host}/{basepath}/{path}',
+				status_code = 200,
+				text = '{"rows":[],"success":true}'
+			)
+			assert sdk.logout() == True
+			assert sdk.login_session_check()[0] == True
+			assert m.call_count == 5
+		sdk.clear_cache()
+		print("Passed!!!")
+
+	def test_login_session_reuse(self, tmp_path):
+		"""
+		# Session reuse
+
+		When the SDK already holds a session cookie, `login` first checks the session and skips sending credentials if the same user is still logged in. Passing `session_cache_path` saves the session cookies after a successful login so that later SDK instances can reuse the session, and removes them again on logout.
+
+		## Usage
+
+		    sdk = sdkv1(
+		        hoststring = 'https://10.10.10.10:4443',
+		        session_cache_path = '/home/restuser/.gravsdk_session'
+		    )
+		"""
+		print("")
+		print("session reuse tests")
+		print("-------------------")
+		print("Test: `login with a live session`")
+		path = 'login'
+		cache_path = str(tmp_path / 'session.json')
+		with requests_mock.mock() as m:
+			m.post(
+				f'{host}/{basepath}/{path}',
+				status_code = 200,
+				text = """{
+					"rows": [{"FORCE_PWD_CHANGE":false,"USER":"restuser","expired_pwd":false}],
+					"success":true
+				}"""
+			)
+			m.get(
+				f'{host}/{basepath}/{path}',
+				status_code = 200,
+				text = """{
+					"rows": [{"FORCE_PWD_CHANGE":false,"USER":"restuser","expired_pwd":false}],
+					"success":true
+				}"""
+			)
+			with sdkv1(host, False, session_cache_path = cache_path) as first:
+				assert first.login('restuser', 'puppies1234567890') == True
+			assert m.call_count == 1
+			assert m.last_request.method == 'POST'
+			assert (tmp_path / 'session.json').exists()
+			assert (tmp_path / 'session.json').stat().st_mode & 0o777 == 0o600
+			# Stand in for the cookie the server would have set
+			(tmp_path / 'session.json').write_text('{"session": "abc123"}')
+			with sdkv1(host, False, session_cache_path = cache_path) as second:
+				assert second.CRUD.get_cookies() == { 'session': 'abc123' }
+				assert second.login('restuser', 'puppies1234567890') == True
+				assert m.call_count == 2
+				assert m.last_request.method == 'GET'
+				print("Passed!!!")
+				print("Test: `logout forgets the saved session`")
+				m.delete(
+					f'{host}/{basepath}/{path}',
+					status_code = 200,
+					text = '{"rows":[],"success":true}'
+				)
+				assert second.logout() == True
+			assert not (tmp_path / 'session.json').exists()
+			print("Passed!!!")
+			print("Test: `unwritable session cache`")
+			with sdkv1(host, False, session_cache_path = str(tmp_path / 'missing' / 'session.json')) as third:
+				assert third.login('restuser', 'puppies1234567890') == True
+			print("Passed!!!")
+			print("Test: `unremovable session cache`")
+			(tmp_path / 'blocked').mkdir()
+			with sdkv1(host, False, session_cache_path = str(tmp_path / 'blocked')) as fourth:
+				assert fourth.logout() == True
+		print("Passed!!!")
+
 	def test_logout(self):
 		"""
 		# `logout` SDK method
@@ -299,6 +423,324 @@ class Test_authentication():
 			assert sdk.logout() == True
 		print("Passed!!!")
 
+class Test_async():
+	"""
+	# Asynchronous SDK
+
+	`sdkv1_async` exposes the same methods as `sdkv1` as coroutines so that independent calls can be issued concurrently with `asyncio.gather`.
+
+	## Usage
+
+	    async with sdkv1_async('https://10.10.10.10:4443') as sdk:
+	        success = await sdk.login('restuser', 'gravitas1234567890')
+	"""
+	@staticmethod
+	def run(httpx, handler, calls):
+		"""
+		Run `calls(asdk)` against an `sdkv1_async` whose requests are answered by `handler`
+		"""
+		async def run():
+			async with sdkv1_async(host, False) as asdk:
+				await asdk.CRUD.client.aclose()
+				asdk.CRUD.client = httpx.AsyncClient(transport = httpx.MockTransport(handler))
+				return await calls(asdk)
+		return asyncio.run(run())
+
+	def test_login_session_check(self):
+		httpx = pytest.importorskip('httpx')
+		print("")
+		print("`sdkv1_async` method tests")
+		print("--------------------------")
+		print("Test: `login_session_check: logged in`")
+		def handler(request):
+			assert request.method == 'GET'
+			assert request.url.path == f'/{basepath}/login'
+			return httpx.Response(
+				200,
+				text = """{
+					"rows": [{"USER":"restuser","USER_ID":2}],
+					"success":true
+				}"""
+			)
+		async def calls(asdk):
+			return await asyncio.gather(
+				asdk.login_session_check(),
+				asdk.login_session_check(),
+			)
+		for status, userdata in self.run(httpx, handler, calls):
+			assert status == True
+			assert userdata['USER'] == 'restuser'
+		print("Passed!!!")
+		print("Test: `sync with statement`")
+		asdk = sdkv1_async(host, False)
+		try:
+			with pytest.raises(TypeError):
+				with asdk:
+					pass
+		finally:
+			asyncio.run(asdk.close())
+		print("Passed!!!")
+
+	def test_login_logout(self):
+		httpx = pytest.importorskip('httpx')
+		print("")
+		print("`sdkv1_async` login/logout tests")
+		print("--------------------------------")
+		print("Test: `login then logout`")
+		seen = []
+		def handler(request):
+			assert request.url.path == f'/{basepath}/login'
+			seen.append(request.method)
+			if request.method == 'POST':
+				assert request.headers['Content-Type'] == 'application/json'
+				assert json.loads(request.content) == { 'USER': 'restuser', 'PASSWORD': 'puppies1234567890' }
+				return httpx.Response(
+					200,
+					text = """{
+						"rows": [{"FORCE_PWD_CHANGE":false,"USER":"restuser","expired_pwd":false}],
+						"success":true
+					}"""
+				)
+			assert request.method == 'DELETE'
+			return httpx.Response(200, text = '{"rows":[],"success":true}')
+		async def calls(asdk):
+			return (
+				await asdk.login('restuser', 'puppies1234567890'),
+				await asdk.logout(),
+			)
+		assert self.run(httpx, handler, calls) == (True, True)
+		assert seen == ['POST', 'DELETE']
+		print("Passed!!!")
+		print("Test: `invalid credentials`")
+		def handler(request):
+			return httpx.Response(400, text = '{"error":"invalid credentials","success":false}')
+		async def calls(asdk):
+			return await asdk.login('rest123', 'puppies7890')
+		with pytest.raises(GravAuthError) as e:
+			self.run(httpx, handler, calls)
+		assert f'{e.value}' == 'Login error: `invalid credentials`'
+		print("Passed!!!")
+
+	def test_clients_batch(self):
+		httpx = pytest.importorskip('httpx')
+		print("")
+		print("`sdkv1_async` clients_batch tests")
+		print("---------------------------------")
+		names = { '1': 'Wakeups', '7': 'Msgs Found During Checks' }
+		def handler(request):
+			assert request.url.path.endswith('/rest/OE_CLIEN')
+			client_id = request.url.params['filter'].split('=')[1]
+			if client_id not in names:
+				return httpx.Response(200, text = '{"rows":[],"success":true}')
+			return httpx.Response(
+				200,
+				text = f'{{"rows":[{{"CLIENT_ID":{client_id},"NAME":"{names[client_id]}"}}],"success":true}}'
+			)
+		print("Test: `clients_batch: all found`")
+		clients = self.run(httpx, handler, lambda asdk: asdk.clients_batch([1, 7]))
+		assert clients[1]['NAME'] == 'Wakeups'
+		assert clients[7]['NAME'] == 'Msgs Found During Checks'
+		print("Passed!!!")
+		print("Test: `clients_batch: missing client`")
+		with pytest.raises(GravGeneralError) as e:
+			self.run(httpx, handler, lambda asdk: asdk.clients_batch([1, 9]))
+		assert f'{e.value}' == 'General error: `clients not found: [9]`'
+		print("Passed!!!")
+		print("Test: `clients_batch: not logged in`")
+		def handler(request):
+			return httpx.Response(200, text = '{"error":"not logged in","success":false}')
+		with pytest.raises(GravAuthError) as e:
+			self.run(httpx, handler, lambda asdk: asdk.clients_batch([1, 2]))
+		assert f'{e.value}' == 'Login error: `not logged in`'
+		print("Passed!!!")
+
+def test_clients_batch():
+	"""
+	# `clients_batch` SDK method
+
+	The `clients_batch` SDK method looks up several clients concurrently and returns a dictionary of client information keyed by client id. The lookups are issued in parallel over the pooled connection, so the total time is close to that of a single lookup. No ordering of the lookups is guaranteed.
+
+	|Attribute|Required|Type|Description|
+	|-|-|-|-|
+	|`client_ids`|yes|list of integers|Client ids to look up|
+	|`limit`|no|integer|Row limit sent with each lookup (defaults to `9999`)|
+
+	## Expected return value format
+
+	A dictionary mapping each requested client id to the client's information. A `GravGeneralError` listing the unknown ids is raised if any client is not found, and a `GravAuthError` is raised if the API reports an error such as not being logged in.
+
+	## Usage
+
+	    clients = sdk.clients_batch([1, 7])
+	    print(clients[7]['NAME'])
+	"""
+	print("")
+	print("`clients_batch` method tests")
+	print("----------------------------")
+	print("Test: `clients_batch: all found`")
+	# Client paths carry their own /rest prefix, see _CLIENT_LISTING_PATH
+	path = '/rest/OE_CLIEN'
+	with requests_mock.mock() as m:
+		for client_id, name in ((1, 'Wakeups'), (7, 'Msgs Found During Checks')):
+			m.get(
+				f'{host}/{basepath}/{path}?{urllib.parse.urlencode({"filter": f"CLIENT_ID={client_id}"})}',
+				status_code = 200,
+				text = f'{{"rows":[{{"CLIENT_ID":{client_id},"NAME":"{name}"}}],"success":true}}'
+			)
+		m.get(
+			f'{host}/{basepath}/{path}?{urllib.parse.urlencode({"filter": "CLIENT_ID=9"})}',
+			status_code = 200,
+			text = '{"rows":[],"success":true}'
+		)
+		clients = sdk.clients_batch([1, 7])
+		assert clients[1]['NAME'] == 'Wakeups'
+		assert clients[7]['NAME'] == 'Msgs Found During Checks'
+		print("Passed!!!")
+		print("Test: `clients_batch: missing client`")
+		with pytest.raises(GravGeneralError) as e:
+			sdk.clients_batch([1, 9])
+		assert f'{e.value}' == 'General error: `clients not found: [9]`'
+		print("Passed!!!")
+	print("Test: `clients_batch: not logged in`")
+	sdk.clear_cache()
+	with requests_mock.mock() as m:
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 200,
+			text = '{"error":"not logged in","success":false}'
+		)
+		with pytest.raises(GravAuthError) as e:
+			sdk.clients_batch([1, 2])
+		assert f'{e.value}' == 'Login error: `not logged in`'
+	print("Passed!!!")
+
+def test_read_cache():
+	"""
+	# Response caching
+
+	Successful reads are cached for `cache_ttl` seconds (default 30, `0` disables caching). Once an entry expires its ETag is sent back as `If-None-Match`, and a `304 Not Modified` reply reuses the cached data. Any create, update, or delete clears the cache, and `sdk.clear_cache()` clears it explicitly.
+	"""
+	print("")
+	print("response cache tests")
+	print("--------------------")
+	path = '/rest/client/7/ORDERS'
+	sdk.clear_cache()
+	with requests_mock.mock() as m:
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 200,
+			headers = { 'ETag': '"v1"' },
+			text = '{"rows":[{"ORDER_ID":1}],"success":true}'
+		)
+		print("Test: `fresh entry`")
+		first = sdk.client(7).orders().search()
+		second = sdk.client(7).orders().search()
+		assert m.call_count == 1
+		assert second[1] == first[1]
+		# Callers get their own copy of a cached response
+		second[1]['rows'].clear()
+		assert sdk.client(7).orders().search()[1] == first[1]
+		assert m.call_count == 1
+		assert m.last_request.headers['Accept'] == 'application/json'
+		print("Passed!!!")
+		print("Test: `expired entry, not modified`")
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 304,
+		)
+		ttl, sdk.CRUD.cache.ttl = sdk.CRUD.cache.ttl, 1e-9
+		try:
+			third = sdk.client(7).orders().search()
+		finally:
+			sdk.CRUD.cache.ttl = ttl
+		assert m.call_count == 2
+		assert m.last_request.headers['If-None-Match'] == '"v1"'
+		assert third[1] == first[1]
+	sdk.clear_cache()
+	print("Passed!!!")
+
+def test_client_listing_iter():
+	"""
+	# `listing_iter` SDK method
+
+	The `listing_iter` SDK method streams client rows one at a time as the response arrives, for listings too large to load into memory at once. It requires the `ijson` package and is only available on the synchronous `sdkv1`.
+
+	|Attribute|Required|Type|Description|
+	|-|-|-|-|
+	|`fields`|no|list of strings|Fields to return for each client (defaults to all fields)|
+	|`limit`|no|integer|Maximum number of rows to return, `0` returns every row (defaults to `0`)|
+
+	## Expected return value format
+
+	An iterator of dictionaries, one per client row. The API reports success after the rows, so an unsuccessful or malformed response raises `GravAuthError` once the rows received so far have been yielded.
+
+	## Usage
+
+	    for row in sdk.client().listing_iter(fields = ['CLIENT_ID', 'NAME']):
+	        print(row['NAME'])
+	"""
+	pytest.importorskip('ijson')
+	print("")
+	print("`listing_iter` method tests")
+	print("---------------------------")
+	print("Test: `listing_iter: all records`")
+	# Client paths carry their own /rest prefix, see _CLIENT_LISTING_PATH
+	path = '/rest/OE_CLIEN'
+	with requests_mock.mock() as m:
+		m.get(
+			f'{host}/{basepath}/{path}?{urllib.parse.urlencode({"fields": "CLIENT_ID,NAME", "limit": 0})}',
+			complete_qs = True,
+			status_code = 200,
+			text = """{
+				"rows":[
+					{"CLIENT_ID":1,"NAME":"Wakeups"},
+					{"CLIENT_ID":7,"NAME":"Msgs Found During Checks"}
+				],
+				"success":true
+			}"""
+		)
+		rows = list(sdk.client().listing_iter(fields = ['CLIENT_ID', 'NAME']))
+		assert [row['CLIENT_ID'] for row in rows] == [1, 7]
+		print("Passed!!!")
+		print("Test: `listing_iter: error response`")
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 400,
+			text = '{"error":"not logged in","success":false}'
+		)
+		with pytest.raises(GravAuthError) as e:
+			list(sdk.client(7).listing_iter())
+		assert f'{e.value}' == 'Login error: `not logged in`'
+		print("Passed!!!")
+		print("Test: `listing_iter: unsuccessful 200 response`")
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 200,
+			text = '{"error":"not logged in","success":false}'
+		)
+		with pytest.raises(GravAuthError) as e:
+			list(sdk.client(7).listing_iter())
+		assert f'{e.value}' == 'Login error: `not logged in`'
+		print("Passed!!!")
+		print("Test: `listing_iter: missing success key`")
+		m.get(
+			f'{host}/{basepath}/{path}',
+			status_code = 200,
+			text = '{"rows":[{"CLIENT_ID":7}]}'
+		)
+		with pytest.raises(GravAuthError) as e:
+			list(sdk.client(7).listing_iter())
+		assert f'{e.value}' == 'Login error: `api response missing `success` key`'
+	print("Passed!!!")
+	print("Test: `listing_iter: async sdk`")
+	asdk = sdkv1_async(host, False)
+	try:
+		with pytest.raises(GravGeneralError):
+			asdk.client().listing_iter()
+	finally:
+		asyncio.run(asdk.close())
+	print("Passed!!!")
+
 def client():
 	print("")
 	print("`client` method tests")
@@ -5,7 +5,8 @@ setup(
 	packages = ['gravsdk'],
 	version = '0.0.4',
 	install_requires = [
-		'websockets'
+		'requests',
+		'websockets',
 	],
 	description = 'Python SDK for accessing the Gravitas call center environment API',
 	author = 'joshpatten',